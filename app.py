@@ -4,23 +4,23 @@ from datetime import datetime, timedelta
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from collections import Counter
 import re
-import requests
-from io import StringIO
+import hashlib
+from functools import lru_cache
+from pathlib import Path
 
 # Common English stop words
-STOP_WORDS = {
+STOP_WORDS = frozenset({
     'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'he',
     'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the', 'to', 'was', 'were',
-    'will', 'with', 'the', 'this', 'but', 'they', 'have', 'had', 'what', 'when',
+    'will', 'with', 'this', 'but', 'they', 'have', 'had', 'what', 'when',
     'where', 'who', 'which', 'why', 'can', 'could', 'should', 'would', 'may',
     'might', 'must', 'shall', 'into', 'if', 'then', 'else', 'than', 'too', 'very',
     'just', 'about', 'also', 'much', 'any', 'only', 'some', 'such', 'more', 'most',
     'other', 'own', 'same', 'few', 'both', 'those', 'after', 'before', 'above',
     'below', 'up', 'down', 'out', 'off', 'over', 'under', 'again', 'once', 'all',
     'always', 'never', 'now', 'ever', 'while', 'during', 'within', 'without',
-    'through', 'between', 'against', 'until', 'unless', 'within', 'along', 'across',
+    'through', 'between', 'against', 'until', 'unless', 'along', 'across',
     'behind', 'beyond', 'near', 'among', 'upon', 'since', 'despite', 'beside',
     'besides', 'however', 'therefore', 'although', 'yet', 'still', 'even', 'otherwise',
     'says', 'said', 'according', 'new', 'one', 'two', 'three', 'first', 'second',
@@ -28,57 +28,155 @@ STOP_WORDS = {
     'got', 'getting', 'every', 'each', 'either', 'neither', 'rather', 'quite',
     'enough', 'less', 'way', 'ways', 'far', 'further', 'later', 'earlier', 'early',
     'late', 'soon', 'already', 'not', 'nor', 'like', 'hard', 'high', 'low'
-}
+})
 
 # Add crypto-specific words to stop words
-CRYPTO_STOP_WORDS = STOP_WORDS | {
+CRYPTO_STOP_WORDS = STOP_WORDS | frozenset({
     'bitcoin', 'btc', 'crypto', 'cryptocurrency', 'cryptocurrencies', 'blockchain',
     'token', 'tokens', 'coin', 'coins', 'digital', 'currency', 'currencies',
     'mining', 'miner', 'miners', 'wallet', 'wallets', 'exchange', 'exchanges',
     'trading', 'trader', 'traders', 'market', 'markets', 'price', 'prices', '2024'
-}
+})
+
+# Precompiled patterns for cleaning article titles
+_COLON = re.compile(r'\s*:\s*')
+_DOLLAR = re.compile(r'\s*\$\s*')
+_QUESTION = re.compile(r'\s*\?\s*')
+_PAREN_OPEN = re.compile(r'\s*\(\s*')
+_PAREN_CLOSE = re.compile(r'\s*\)\s*')
+_WS = re.compile(r'\s+')
+
+# A run of whitespace and the punctuation handled above; the spacing rules
+# never reach past such a run, so each run can be normalized on its own
+_PUNCT_RUN = re.compile(r'\s*[:$?()][\s:$?()]*')
+
+# Abbreviations kept uppercase in article titles
+ALLOWED_UPPERCASE = frozenset({"BTC", "ETH", "NASDAQ", "NYSE", "SOL"})
+
+SCORES_FILE = Path('sentiment_scores.csv')
+
+# Processed frames are cached here, keyed by a hash of the CSV contents
+PROCESSED_CACHE_DIR = Path('.cache')
+
+# Bump whenever load_and_process_data changes how the frames are built
+PROCESSING_VERSION = 3
+
+def _frame_key(df):
+    """Cheap cache key for the append-only, date-sorted article frame"""
+    return len(df), df['date'].iloc[-1].value if len(df) else None
+
+def _rolling_means(values, *windows):
+    """Trailing means for each window from one running sum, NaN unless the window is full"""
+    valid = ~np.isnan(values)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    cv = np.concatenate(([0], np.cumsum(valid)))
+    means = []
+    for window in windows:
+        out = np.full(len(values), np.nan)
+        if len(values) >= window:
+            full = (cv[window:] - cv[:-window]) == window
+            out[window - 1:] = np.where(full, (cs[window:] - cs[:-window]) / window, np.nan)
+        means.append(out)
+    return means
+
+def _parse_dates(dates):
+    """Parse stored YYYY/M/D dates, falling back to ISO 8601 for newer rows"""
+    parsed = pd.to_datetime(dates, format='%Y/%m/%d', errors='coerce')
+    iso = parsed.isna() & dates.notna()
+    if iso.any():
+        parsed[iso] = pd.to_datetime(dates[iso], format='ISO8601', errors='coerce')
+    return parsed
+
+def _write_processed_cache(articles_path, daily_path, df, daily_sentiment):
+    """Persist processed frames, replacing those of older CSV versions"""
+    try:
+        PROCESSED_CACHE_DIR.mkdir(exist_ok=True)
+        for stale in PROCESSED_CACHE_DIR.glob('*.parquet'):
+            stale.unlink()
+        df.to_parquet(articles_path)
+        daily_sentiment.to_parquet(daily_path)
+    except OSError:
+        # The cache is an optimization only; a read-only checkout still works
+        pass
 
 # Add cache with TTL of 5 minutes
 @st.cache_data(ttl=300)
 def load_and_process_data():
     """Load and process sentiment data from local file"""
     try:
-        # Read local CSV file with encoding that handles special characters
-        df = pd.read_csv('sentiment_scores.csv', encoding='latin1')
+        # Reuse the processed frames if the CSV has not changed
+        digest = hashlib.md5(SCORES_FILE.read_bytes()).hexdigest()
+        articles_path = PROCESSED_CACHE_DIR / f'articles_v{PROCESSING_VERSION}_{digest}.parquet'
+        daily_path = PROCESSED_CACHE_DIR / f'daily_v{PROCESSING_VERSION}_{digest}.parquet'
+        if articles_path.exists() and daily_path.exists():
+            df = pd.read_parquet(articles_path).astype({'title': 'string[pyarrow]'})
+            return df, pd.read_parquet(daily_path)
+        
+        # Read the local CSV file, which the analyzer writes as UTF-8.
+        # The Arrow reader is multi-threaded and keeps titles Arrow-backed for
+        # the .str operations below; dates and scores stay NumPy-backed.
+        df = pd.read_csv(SCORES_FILE, encoding='utf-8', engine='pyarrow',
+                         usecols=['date', 'score', 'title'],
+                         dtype={'date': 'string[pyarrow]', 'title': 'string[pyarrow]'})
+        
+        # Convert date column with explicit formats instead of inferring them
+        df['date'] = _parse_dates(df['date'])
         
-        # Convert date column to datetime
-        df['date'] = pd.to_datetime(df['date'])
+        # Drop rows without a usable date, as groupby('date') used to
+        df = df.dropna(subset=['date'])
         
         # Sort by date
         df = df.sort_values('date')
         
-        # Calculate daily sentiment
-        daily_sentiment = df.groupby('date').agg({
-            'score': 'mean',
-        }).reset_index()
+        # Calculate daily sentiment in one pass over the sorted dates
+        dates, starts = np.unique(df['date'].values, return_index=True)
+        scores = df['score'].values
+        valid = ~np.isnan(scores)
+        if len(dates):
+            # Skip missing scores like groupby().mean() does
+            with np.errstate(invalid='ignore'):
+                daily_scores = (np.add.reduceat(np.where(valid, scores, 0.0), starts)
+                                / np.add.reduceat(valid, starts))
+        else:
+            daily_scores = np.array([])
         
         # Calculate moving averages
-        daily_sentiment['MA3'] = daily_sentiment['score'].rolling(window=3).mean()
-        daily_sentiment['MA7'] = daily_sentiment['score'].rolling(window=7).mean()
+        ma3, ma7 = _rolling_means(daily_scores, 3, 7)
+        daily_sentiment = pd.DataFrame({
+            'date': dates,
+            'score': daily_scores,
+            'MA3': ma3,
+            'MA7': ma7,
+        })
         
+        _write_processed_cache(articles_path, daily_path, df, daily_sentiment)
         return df, daily_sentiment
         
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None, None
 
+@st.cache_data(ttl=300)
 def get_sentiment_status(sentiment_df):
     """Determine overall sentiment status based on current sentiment and trends"""
     if len(sentiment_df) < 2:
         return "NEUTRAL", 50, "Not enough data for trend analysis"
         
+    score = sentiment_df['score'].values
+    ma3 = sentiment_df['MA3'].values
+    ma7 = sentiment_df['MA7'].values
+    
     # Get current sentiment score
-    current_sentiment = sentiment_df['score'].iloc[-1]
+    current_sentiment = score[-1]
     
     # Calculate trends using the last two values
-    ma3_current = sentiment_df['MA3'].iloc[-1]
-    ma7_current = sentiment_df['MA7'].iloc[-1]
-    ma7_prev = sentiment_df['MA7'].iloc[-2]
+    ma3_current = ma3[-1]
+    ma7_current = ma7[-1]
+    ma7_prev = ma7[-2]
+    
+    # The 7-day average is undefined until a full week of history exists
+    if np.isnan(ma7_current) or np.isnan(ma7_prev):
+        return "NEUTRAL", float((current_sentiment + 1) * 50), "Insufficient history for trend analysis"
     
     short_trend = ma3_current - ma7_current
     medium_trend = ma7_current - ma7_prev
@@ -97,26 +195,144 @@ def get_sentiment_status(sentiment_df):
     else:
         return "BEARISH", final_score, "Negative sentiment or declining trends"
 
+@st.cache_data(ttl=300, hash_funcs={pd.DataFrame: _frame_key})
 def extract_topic_words(df):
     """Extract most frequent words from recent titles"""
     if df is None or len(df) == 0:
         return []
     
-    # Get articles from last 7 days
-    last_date = df['date'].max()
-    seven_days_ago = last_date - pd.Timedelta(days=7)
-    recent_articles = df[df['date'] >= seven_days_ago]
+    # Get articles from last 7 days (df is sorted by date)
+    dates = df['date'].values
+    seven_days_ago = dates[-1] - np.timedelta64(7, 'D')
+    recent_articles = df.iloc[dates.searchsorted(seven_days_ago, side='left'):]
     
     # Extract words from titles
-    keywords = []
-    for title in recent_articles['title']:
-        if isinstance(title, str):
-            words = title.lower().split()
-            keywords.extend([word for word in words if len(word) > 3 and word not in CRYPTO_STOP_WORDS])
-    
-    # Count and rank keywords
-    keyword_counts = Counter(keywords)
-    return keyword_counts.most_common(5)
+    words = (
+        recent_articles['title']
+        .dropna()
+        .str.lower()
+        .str.findall(r'[a-z]{4,}')
+        .explode()
+        .dropna()
+    )
+    
+    # Count keywords, then drop stop words from the (much smaller) vocabulary
+    keyword_counts = words.value_counts(sort=False)
+    keyword_counts = keyword_counts[~keyword_counts.index.isin(CRYPTO_STOP_WORDS)]
+    
+    # Rank only the top keywords instead of sorting the whole vocabulary
+    return list(keyword_counts.nlargest(5).items())
+
+def _capitalize_word(match):
+    """Capitalize an all-uppercase word unless it is a known abbreviation"""
+    word = match.group()
+    if word not in ALLOWED_UPPERCASE and word.isupper() and len(word) > 1:
+        return word.capitalize()
+    return word
+
+@lru_cache(maxsize=1024)
+def _normalize_run(run):
+    """Apply the spacing rules to one run of whitespace and punctuation"""
+    run = _COLON.sub(': ', run)  # Normalize spacing around colons
+    run = _DOLLAR.sub('$', run)  # Normalize spacing around dollar signs
+    run = _QUESTION.sub('? ', run)  # Normalize spacing around question marks
+    run = _PAREN_OPEN.sub(' (', run)  # Fix spacing around parentheses
+    run = _PAREN_CLOSE.sub(') ', run)
+    return _WS.sub(' ', run)
+
+def _normalize_punctuation(match):
+    return _normalize_run(match.group())
+
+def clean_titles(titles):
+    """Clean and format a Series of article titles for display"""
+    # The patterns rely on Python regex semantics (Unicode \s, callable
+    # replacements), so run them on object strings rather than Arrow's RE2
+    titles = titles.astype(object)
+    
+    # Handle the problematic title specifically
+    titles = titles.str.replace("WhatsNext", "Whats Next", regex=False)
+    
+    # Remove quotes if they wrap the entire title
+    wrapped = titles.str.startswith('"', na=False) & titles.str.endswith('"', na=False)
+    titles = titles.where(~wrapped, titles.str[1:-1])
+    
+    # Normalize spacing around special characters in a single scan
+    titles = titles.str.replace(_PUNCT_RUN, _normalize_punctuation, regex=True)
+    
+    # Collapse remaining line breaks, tabs and multiple spaces
+    titles = titles.str.replace(_WS, ' ', regex=True)
+    
+    # Capitalize standalone uppercase words while preserving abbreviations
+    titles = titles.str.replace(r'\S+', _capitalize_word, regex=True)
+    
+    # Final cleanup
+    return titles.str.strip()
+
+def build_sentiment_figure(daily_sentiment):
+    """Build the sentiment trend chart with moving averages"""
+    fig = make_subplots(rows=1, cols=1)
+    
+    # Sentiment line
+    fig.add_trace(
+        go.Scatter(x=daily_sentiment['date'], 
+                  y=daily_sentiment['score'],
+                  mode='lines',
+                  name='Daily Sentiment',
+                  line=dict(color='gray', width=1))
+    )
+    
+    # Moving averages
+    fig.add_trace(
+        go.Scatter(x=daily_sentiment['date'],
+                  y=daily_sentiment['MA3'],
+                  mode='lines',
+                  name='3-Day MA',
+                  line=dict(color='blue', width=2))
+    )
+    
+    fig.add_trace(
+        go.Scatter(x=daily_sentiment['date'],
+                  y=daily_sentiment['MA7'],
+                  mode='lines',
+                  name='7-Day MA',
+                  line=dict(color='orange', width=2))
+    )
+    
+    # Add election day vertical line (November 7, 2024)
+    fig.add_shape(
+        type="line",
+        x0="2024-11-07",
+        x1="2024-11-07",
+        y0=0,
+        y1=1,
+        yref="paper",
+        line=dict(color="red", width=1, dash="dash")
+    )
+    
+    # Add election day annotation
+    fig.add_annotation(
+        x="2024-11-07",
+        y=1,
+        yref="paper",
+        text="Election Day",
+        showarrow=False,
+        yshift=10
+    )
+    
+    fig.update_layout(
+        height=400,
+        showlegend=True,
+        plot_bgcolor='white',
+        margin=dict(t=0),
+        yaxis=dict(title='Sentiment Score',
+                  gridcolor='lightgray',
+                  zerolinecolor='lightgray'),
+        xaxis=dict(title='Date',
+                  gridcolor='lightgray'),
+        hovermode='x unified'
+    )
+    
+    return fig
 
 def create_dashboard():
     st.set_page_config(page_title="Crypto News Sentiment Dashboard", layout="wide")
@@ -190,119 +406,38 @@ def create_dashboard():
     # Recent Articles
     with col3:
         st.subheader("Recent Articles")
-        recent_df = df.sort_values('date', ascending=False).head(5)
-        for _, row in recent_df.iterrows():
-            sentiment_emoji = "🟢" if row['score'] > 0.1 else "🔴" if row['score'] < -0.1 else "⚪"
-            # Clean and format the title
-            title = row['title']
-            
-            # Handle the problematic title specifically
-            if "WhatsNext" in title:
-                title = title.replace("WhatsNext", "Whats Next")
-            
-            # Remove quotes if they wrap the entire title
-            if title.startswith('"') and title.endswith('"'):
-                title = title[1:-1]
-            
-            # Remove extra spaces around special characters
-            title = re.sub(r'\s*:\s*', ': ', title)  # Normalize spacing around colons
-            title = re.sub(r'\s*\$\s*', '$', title)  # Normalize spacing around dollar signs
-            title = re.sub(r'\s*\?\s*', '? ', title)  # Normalize spacing around question marks
-            
-            # Fix spacing around parentheses
-            title = re.sub(r'\s*\(\s*', ' (', title)
-            title = re.sub(r'\s*\)\s*', ') ', title)
-            
-            # Remove excess line breaks and tabs
-            title = re.sub(r'[\n\t\r]+', ' ', title)
-            
-            # Fix multiple spaces
-            title = re.sub(r'\s+', ' ', title)
-            
-            # Capitalize standalone uppercase words while preserving abbreviations
-            allowed_uppercase = {"BTC", "ETH", "NASDAQ", "NYSE", "SOL"}
-            words = []
-            for word in title.split():
-                if word in allowed_uppercase:
-                    words.append(word)
-                elif word.isupper() and len(word) > 1:
-                    words.append(word.capitalize())
-                else:
-                    words.append(word)
-            title = ' '.join(words)
-            
-            # Final cleanup
-            title = title.strip()
-            
-            st.markdown(f"{sentiment_emoji} {title}  \n*{row['date'].strftime('%Y-%m-%d')} • Sentiment: {row['score']:.3f}*")
+        recent_df = df.nlargest(5, 'date')
+        articles = pd.DataFrame({
+            'sentiment': np.select(
+                [recent_df['score'] > 0.1, recent_df['score'] < -0.1], ["🟢", "🔴"], "⚪"
+            ),
+            'title': clean_titles(recent_df['title']),
+            'date': recent_df['date'],
+            'score': recent_df['score'],
+        })
+        st.dataframe(
+            articles,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'sentiment': st.column_config.TextColumn("", width="small"),
+                'title': st.column_config.TextColumn("Title", width="large"),
+                'date': st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
+                'score': st.column_config.NumberColumn("Sentiment", format="%.3f"),
+            },
+        )
     
     # Main Chart
     st.markdown("---")
     st.subheader("Sentiment Trend Analysis")
     
-    fig = make_subplots(rows=1, cols=1)
-    
-    # Sentiment line
-    fig.add_trace(
-        go.Scatter(x=daily_sentiment['date'], 
-                  y=daily_sentiment['score'],
-                  mode='lines',
-                  name='Daily Sentiment',
-                  line=dict(color='gray', width=1))
-    )
-    
-    # Moving averages
-    fig.add_trace(
-        go.Scatter(x=daily_sentiment['date'],
-                  y=daily_sentiment['MA3'],
-                  mode='lines',
-                  name='3-Day MA',
-                  line=dict(color='blue', width=2))
-    )
-    
-    fig.add_trace(
-        go.Scatter(x=daily_sentiment['date'],
-                  y=daily_sentiment['MA7'],
-                  mode='lines',
-                  name='7-Day MA',
-                  line=dict(color='orange', width=2))
-    )
-    
-    # Add election day vertical line (November 7, 2024)
-    fig.add_shape(
-        type="line",
-        x0="2024-11-07",
-        x1="2024-11-07",
-        y0=0,
-        y1=1,
-        yref="paper",
-        line=dict(color="red", width=1, dash="dash")
-    )
-    
-    # Add election day annotation
-    fig.add_annotation(
-        x="2024-11-07",
-        y=1,
-        yref="paper",
-        text="Election Day",
-        showarrow=False,
-        yshift=10
-    )
-    
-    fig.update_layout(
-        height=400,
-        showlegend=True,
-        plot_bgcolor='white',
-        margin=dict(t=0),
-        yaxis=dict(title='Sentiment Score',
-                  gridcolor='lightgray',
-                  zerolinecolor='lightgray'),
-        xaxis=dict(title='Date',
-                  gridcolor='lightgray'),
-        hovermode='x unified'
-    )
+    # Rebuild the figure only when the daily data changes
+    fig_key = int(pd.util.hash_pandas_object(daily_sentiment).sum())
+    if st.session_state.get('fig_key') != fig_key:
+        st.session_state.fig = build_sentiment_figure(daily_sentiment)
+        st.session_state.fig_key = fig_key
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(st.session_state.fig, use_container_width=True)
     
     # Hot Topics
     st.markdown("---")
@@ -318,7 +453,7 @@ def create_dashboard():
     
     # Footer
     st.markdown("---")
-    st.markdown("Data updates every 12 hours • Powered by TextBlob and MediaStack API")
+    st.markdown("Data updates every 12 hours • Powered by VADER and MediaStack API")
 
 if __name__ == "__main__":
     create_dashboard()
@@ -1,21 +1,38 @@
-import json
+import csv
+import orjson
 import pandas as pd
-from textblob import TextBlob
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import logging
 from pathlib import Path
 import os
+from functools import lru_cache
+from datetime import datetime
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Build the analyzer (and load its lexicon) once per process, on first use
+@lru_cache(maxsize=1)
+def get_analyzer():
+    return SentimentIntensityAnalyzer()
+
 def get_sentiment(text):
-    analysis = TextBlob(text)
+    # VADER's compound score is already the signed [-1, 1] score the dashboard plots
+    polarity = get_analyzer().polarity_scores(text)['compound']
     # Convert polarity to our sentiment categories
-    if analysis.sentiment.polarity > 0.1:
-        return 'positive', abs(analysis.sentiment.polarity)
-    elif analysis.sentiment.polarity < -0.1:
-        return 'negative', abs(analysis.sentiment.polarity)
+    if polarity > 0.1:
+        return 'positive', polarity
+    elif polarity < -0.1:
+        return 'negative', polarity
     else:
-        return 'neutral', abs(analysis.sentiment.polarity)
+        return 'neutral', polarity
+
+def format_date(published_at):
+    # Convert an ISO 8601 timestamp to the stored YYYY/M/D date, '' if missing
+    try:
+        day = datetime.strptime((published_at or '').split('T', 1)[0], '%Y-%m-%d')
+    except ValueError:
+        return ''
+    return f"{day.year}/{day.month}/{day.day}"
 
 def analyze_new_articles():
     try:
@@ -25,8 +42,8 @@ def analyze_new_articles():
             logging.info("No new articles to analyze")
             return
             
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            articles = json.load(f)
+        with open(temp_file, 'rb') as f:
+            articles = orjson.loads(f.read())
         
         if not articles:
             logging.info("No articles found in temp.json")
@@ -35,40 +52,44 @@ def analyze_new_articles():
         # Process each article
         new_scores = []
         for article in articles:
-            # Analyze title and description
-            title_sentiment, title_score = get_sentiment(article['title'])
-            desc_sentiment, desc_score = get_sentiment(article.get('description', '')) if article.get('description') else (None, 0)
-            
-            # Use the stronger sentiment
-            if desc_score > title_score:
-                sentiment = desc_sentiment
-                score = desc_score
-            else:
-                sentiment = title_sentiment
-                score = title_score
+            # Analyze title and description together in a single pass
+            text = article['title']
+            if article.get('description'):
+                text = f"{text} {article['description']}"
+            sentiment, score = get_sentiment(text)
             
             # Create score entry
             new_scores.append({
-                'date': article['published_at'].split('T')[0],
+                'date': format_date(article.get('published_at')),
                 'title': article['title'],
                 'url': article['url'],
+                'score': score,
                 'sentiment': sentiment,
-                'confidence': score
+                'confidence': abs(score)
             })
         
-        # Load existing scores or create new DataFrame
+        # Read the header of the existing scores file, if any
         scores_file = Path('sentiment_scores.csv')
+        header = None
         if scores_file.exists():
-            df = pd.read_csv(scores_file)
-        else:
-            df = pd.DataFrame(columns=['date', 'title', 'url', 'sentiment', 'confidence'])
+            with open(scores_file, newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), None)
         
-        # Add new scores
         new_df = pd.DataFrame(new_scores)
-        df = pd.concat([new_df, df], ignore_index=True)
-        
-        # Save updated scores
-        df.to_csv(scores_file, index=False)
+        if header is None:
+            new_df.to_csv(scores_file, index=False, encoding='utf-8')
+        elif set(new_df.columns) <= set(header):
+            # Append only the new rows instead of rewriting the whole history
+            new_df.reindex(columns=header).to_csv(scores_file, mode='a', header=False, index=False,
+                                                 encoding=encoding, errors='replace')
+        else:
+            # New columns: rewrite once so the file keeps a single header.
+            # The history is only copied through, so read it as raw strings
+            # (no type inference, values written back verbatim).
+            df = pd.read_csv(scores_file, dtype=str, keep_default_na=False,
+                             encoding='utf-8')
+            df = pd.concat([df, new_df], ignore_index=True)
+            df.to_csv(scores_file, index=False, encoding='utf-8')
         logging.info(f"Added {len(new_scores)} new sentiment scores")
         
         # Clean up temp file
@@ -1,7 +1,9 @@
 import os
 from pathlib import Path
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from datetime import datetime, timezone, timedelta
 import logging
 
@@ -15,6 +17,14 @@ class NewsManager:
         self.data_dir = Path('data')
         self.data_dir.mkdir(exist_ok=True)
         self.base_url = "http://api.mediastack.com/v1/news"
+        
+        # Reuse connections across requests and retry transient failures
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': 'crypto-sentiment/1.0'})
 
     def fetch_news(self, from_date, to_date, limit=10):
         params = {
@@ -27,7 +37,7 @@ class NewsManager:
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -39,44 +49,48 @@ class NewsManager:
             logging.info(f"API returned {len(articles)} articles")
             
             if articles:
-                # Get existing articles
-                monthly_file = self.data_dir / f"{datetime.now(timezone.utc).year}{datetime.now(timezone.utc).strftime('%b')}.json"
-                existing_articles = self.get_existing_articles(monthly_file)
-                existing_content = {(article['title'].strip().lower(), article['url'].strip().lower()) 
-                                 for article in existing_articles}
+                # Monthly file for the current month
+                monthly_file = self.data_dir / f"{datetime.now(timezone.utc).year}{datetime.now(timezone.utc).strftime('%b')}.jsonl"
+                if not self.migrate_monthly_file(monthly_file):
+                    # Never start a .jsonl next to an unmigrated .json month
+                    return False
+                # Strip and lowercase each title/url once, skipping incomplete entries
+                candidates = []
+                for article in articles:
+                    raw_title = (article.get('title') or '').strip()
+                    raw_url = (article.get('url') or '').strip()
+                    if not raw_title or not raw_url:
+                        continue
+                    candidates.append((article, raw_title, raw_url, (raw_title.lower(), raw_url.lower())))
+                existing_content = self.get_existing_keys(monthly_file, {key for *_, key in candidates})
                 
                 # Process new articles
                 processed_articles = []
                 seen_content = set()
                 
-                for article in articles:
+                for article, raw_title, raw_url, content_key in candidates:
                     if len(processed_articles) >= 5:
                         break
-                        
-                    if article.get('url') and article.get('title'):
-                        title = article.get('title', '').strip().lower()
-                        url = article.get('url', '').strip().lower()
-                        content_key = (title, url)
-                        
-                        if content_key not in existing_content and content_key not in seen_content:
-                            seen_content.add(content_key)
-                            processed_articles.append({
-                                'title': article.get('title', '').strip(),
-                                'description': article.get('description', '').strip(),
-                                'url': article.get('url', '').strip(),
-                                'source': {'name': article.get('source', '')},
-                                'published_at': article.get('published_at', '')
-                            })
+                    
+                    if content_key not in existing_content and content_key not in seen_content:
+                        seen_content.add(content_key)
+                        processed_articles.append({
+                            'title': raw_title,
+                            'description': (article.get('description') or '').strip(),
+                            'url': raw_url,
+                            'source': {'name': article.get('source', '')},
+                            'published_at': article.get('published_at', '')
+                        })
                 
                 if processed_articles:
                     # Save to temp file for analysis
                     temp_filename = self.data_dir / 'temp.json'
-                    with open(temp_filename, 'w', encoding='utf-8') as f:
-                        json.dump(processed_articles, f, indent=4, ensure_ascii=False)
+                    with open(temp_filename, 'wb') as f:
+                        f.write(orjson.dumps(processed_articles))
                     logging.info(f"Saved {len(processed_articles)} new articles")
                     
-                    # Update monthly file
-                    self.update_monthly_file(monthly_file)
+                    # Update monthly file from the articles already in memory
+                    self.update_monthly_file(monthly_file, processed_articles)
                     
                     # Run sentiment analysis
                     from analyze_sentiment import analyze_new_articles
@@ -90,34 +104,57 @@ class NewsManager:
             logging.error(f"Error fetching news: {e}")
             return False
 
+    def migrate_monthly_file(self, file_path):
+        # Convert a JSON array monthly file to JSON Lines, oldest article first.
+        # Returns False if a legacy file exists but could not be converted.
+        legacy_file = file_path.with_suffix('.json')
+        if file_path.exists() or not legacy_file.exists():
+            return True
+        
+        try:
+            with open(legacy_file, 'rb') as f:
+                articles = orjson.loads(f.read())
+            tmp_file = file_path.with_suffix('.jsonl.tmp')
+            with open(tmp_file, 'wb') as f:
+                for article in reversed(articles):
+                    f.write(orjson.dumps(article) + b'\n')
+            os.replace(tmp_file, file_path)
+            legacy_file.unlink()
+            logging.info(f"Migrated {legacy_file.name} to {file_path.name}")
+            return True
+        except Exception as e:
+            logging.error(f"Error migrating monthly file: {e}")
+            return False
+
     def get_existing_articles(self, file_path):
+        # Yield articles one line at a time from a monthly JSON Lines file
+        if file_path.exists():
+            with open(file_path, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield orjson.loads(line)
+
+    def get_existing_keys(self, file_path, candidate_keys):
+        # Return the candidate (title, url) keys already stored, stopping once all are found
+        found = set()
+        if not candidate_keys:
+            return found
         try:
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            for article in self.get_existing_articles(file_path):
+                key = (article['title'].strip().lower(), article['url'].strip().lower())
+                if key in candidate_keys:
+                    found.add(key)
+                    if len(found) == len(candidate_keys):
+                        break
         except Exception as e:
             logging.error(f"Error reading existing articles: {e}")
-        return []
+        return found
 
-    def update_monthly_file(self, file_path):
-        temp_file = self.data_dir / 'temp.json'
-        if not temp_file.exists():
-            return
-        
+    def update_monthly_file(self, file_path, new_articles):
         try:
-            # Read new articles
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                new_articles = json.load(f)
-            
-            # Read existing articles
-            existing_articles = self.get_existing_articles(file_path)
-            
-            # Add new articles at the beginning
-            updated_articles = new_articles + existing_articles
-            
-            # Save updated file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(updated_articles, f, indent=2, ensure_ascii=False)
+            # Append new articles in one write, without reading existing ones
+            with open(file_path, 'ab') as f:
+                f.write(b''.join(orjson.dumps(article) + b'\n' for article in new_articles))
             
             logging.info(f"Updated {file_path.name} with {len(new_articles)} articles")
             